@@ -23,6 +23,7 @@ from twisted.internet.defer import inlineCallbacks, Deferred, returnValue, succe
 
 from crossbar.bridge.mqtt.tx import MQTTServerTwistedProtocol
 from crossbar.router.session import RouterSession
+from crossbar.router.protocol import RouterSessionTransport
 
 from autobahn import util
 from autobahn.wamp import message, role
@@ -127,9 +128,7 @@ def _wamp_topic_to_mqtt(topic):
     return '/'.join(topic.split('.'))
 
 
-class WampTransport(object):
-    _authid = None
-
+class WampTransport(RouterSessionTransport):
     def __init__(self, factory, on_message, real_transport):
         self.factory = factory
         self.on_message = on_message
@@ -161,6 +161,8 @@ class IRealmStore(abc.ABC):
     @abc.abstractmethod
     def store_session_joined(self, session: ISession, details: SessionDetails):
         """
+        Called on the reactor thread for every session joining a realm, and hence
+        must not block (e.g. buffer the session record for a background writer).
 
         :param session: Session that has joined a realm.
         :param details: Session details of the joined session.
@@ -169,6 +171,8 @@ class IRealmStore(abc.ABC):
     @abc.abstractmethod
     def store_session_left(self, session: ISession, details: CloseDetails):
         """
+        Called on the reactor thread for every session leaving a realm, and hence
+        must not block (e.g. buffer the session record for a background writer).
 
         :param session: Session that has left a realm it was previously joined on.
         :param details: Session close details.
@@ -14,11 +14,12 @@ from twisted.internet.error import ConnectionDone
 from txaio import make_logger
 
 from crossbar._util import hltype
+from crossbar.router.protocol import RouterSessionTransport
 
 __all__ = ('create_native_worker_client_factory', )
 
 
-class NativeWorkerClientProtocol(WampWebSocketClientProtocol):
+class NativeWorkerClientProtocol(RouterSessionTransport, WampWebSocketClientProtocol):
 
     log = make_logger()
 
@@ -572,15 +572,25 @@ class CookieStoreDatabaseBacked(CookieStore):
 
         was_existing = False
         was_modified = False
-        with self._db.begin(write=True) as txn:
+
+        # check for changes in a read-only transaction first, as most sessions joining on a cookie
+        # do not change its authentication info (and write transactions are serialized)
+        needs_update = False
+        with self._db.begin() as txn:
             cookie_oid = self._schema.idx_cookies_by_value[txn, cbtid]
             if cookie_oid:
                 # read current cookie from database
                 cookie = self._schema.cookies[txn, cookie_oid]
                 assert cookie
                 was_existing = True
-                if (authid != cookie.authid or authrole != cookie.authrole or authmethod != cookie.authmethod
-                        or authrealm != cookie.authrealm or authextra != cookie.authextra):
+                needs_update = (authid != cookie.authid or authrole != cookie.authrole
+                                or authmethod != cookie.authmethod or authrealm != cookie.authrealm
+                                or authextra != cookie.authextra)
+
+        if needs_update:
+            with self._db.begin(write=True) as txn:
+                cookie = self._schema.cookies[txn, cookie_oid]
+                if cookie:
                     cookie.authid = authid
                     cookie.authrole = authrole
                     cookie.authmethod = authmethod
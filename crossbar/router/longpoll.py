@@ -26,6 +26,8 @@ from autobahn.wamp.exception import SerializationError, \
 from txaio import make_logger
 from txaio import failure_format_traceback, failure_message, create_failure
 
+from crossbar.router.protocol import RouterSessionTransport
+
 __all__ = ('WampLongPollResource', )
 
 
@@ -233,7 +235,7 @@ class WampLongPollResourceSessionClose(Resource):
         return b""
 
 
-class WampLongPollResourceSession(Resource):
+class WampLongPollResourceSession(RouterSessionTransport, Resource):
     """
     A Web resource representing an open WAMP session.
     """
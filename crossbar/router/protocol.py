@@ -29,6 +29,7 @@ from crossbar.common.twisted.endpoint import create_connecting_endpoint_from_con
 log = make_logger()
 
 __all__ = (
+    'RouterSessionTransport',
     'WampWebSocketServerFactory',
     'WampRawSocketServerFactory',
     'WampWebSocketServerProtocol',
@@ -169,7 +170,24 @@ def set_websocket_options(factory, options):
         )
 
 
-class WampWebSocketServerProtocol(websocket.WampWebSocketServerProtocol):
+class RouterSessionTransport(object):
+    """
+    Base class of all transports that carry router sessions.
+
+    Router sessions access the transport-level WAMP authentication info and the cookie tracking
+    ID of their transport directly. Transports set these per connection, and otherwise the
+    defaults here apply.
+    """
+    _authid = None
+    _authrole = None
+    _authrealm = None
+    _authmethod = None
+    _authprovider = None
+    _authextra = None
+    _cbtid = None
+
+
+class WampWebSocketServerProtocol(RouterSessionTransport, websocket.WampWebSocketServerProtocol):
     """
     Crossbar.io WAMP-over-WebSocket server protocol.
     """
@@ -539,7 +557,7 @@ def set_rawsocket_options(factory, options):
     factory.setProtocolOptions(maxMessagePayloadSize=c.get("max_message_size", None))
 
 
-class WampRawSocketServerProtocol(rawsocket.WampRawSocketServerProtocol):
+class WampRawSocketServerProtocol(RouterSessionTransport, rawsocket.WampRawSocketServerProtocol):
     """
     Crossbar.io WAMP-over-RawSocket server protocol.
     """
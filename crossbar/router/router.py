@@ -5,6 +5,7 @@
 #
 #####################################################################################
 
+import os
 import txaio
 import uuid
 from pprint import pformat
@@ -102,6 +103,11 @@ class Router(object):
         self._dealer = self.dealer(self, factory._reactor, self._options)
         self._attached = 0
 
+        # number of message deliveries to sessions or session detachments currently in progress
+        # (these can nest) - while non-zero, sessions must not be detached synchronously, since
+        # broker and dealer might be iterating over state that detaching would modify (see #578)
+        self._in_broadcast = 0
+
         self._roles = {'trusted': RouterTrustedRole(self, 'trusted')}
 
         # FIXME: this was previously just checking for existence of
@@ -266,8 +272,12 @@ class Router(object):
         """
         Implements :func:`autobahn.wamp.interfaces.IRouter.detach`
         """
-        self._broker.detach(session)
-        self._dealer.detach(session)
+        self._in_broadcast += 1
+        try:
+            self._broker.detach(session)
+            self._dealer.detach(session)
+        finally:
+            self._in_broadcast -= 1
 
         if session._session_id in self._session_id_to_session:
             del self._session_id_to_session[session._session_id]
@@ -294,7 +304,11 @@ class Router(object):
             self.log.info("<<TX<< {msg}", msg=msg)
 
         if session._transport:
-            session._transport.send(msg)
+            self._in_broadcast += 1
+            try:
+                session._transport.send(msg)
+            finally:
+                self._in_broadcast -= 1
 
             if self._is_traced:
                 self._factory._worker._maybe_trace_tx_msg(session, msg)
@@ -370,11 +384,12 @@ class Router(object):
 
         :returns: bool - `True` if a role under the given URI exists on this router.
         """
+        exists = uri in self._roles
         self.log.info('{func}: uri="{uri}", exists={exists}',
                       func=hltype(self.has_role),
                       uri=hlval(uri),
-                      exists=(uri in self._roles))
-        return uri in self._roles
+                      exists=exists)
+        return exists
 
     def add_role(self, role):
         """
@@ -632,6 +647,14 @@ class RouterFactory(object):
         from twisted.internet import reactor
         self._reactor = reactor
 
+        # custom WELCOME attributes which are the same for all router sessions (the transport
+        # peer of the session is added per session)
+        self._welcome_custom = {
+            'x_cb_node': node_id,
+            'x_cb_worker': worker_id,
+            'x_cb_pid': os.getpid(),
+        }
+
         from crossbar.worker.router import RouterController
         from crossbar.worker.proxy import ProxyController
         assert worker is None or isinstance(worker, RouterController) or isinstance(worker, ProxyController)
@@ -382,7 +382,7 @@ class RouterServiceAgent(ApplicationSession):
 
         pub = message.Publish(request=pub_id, topic=topic, args=args, kwargs=kwargs, **publish_options)
 
-        session._testaments[scope].append(pub)
+        session._testaments.setdefault(scope, []).append(pub)
 
         return pub_id
 
@@ -402,9 +402,7 @@ class RouterServiceAgent(ApplicationSession):
         if scope not in ["destroyed", "detached"]:
             raise ApplicationError("wamp.error.testament_error", "scope must be destroyed or detached")
 
-        flushed = len(session._testaments[scope])
-
-        session._testaments[scope] = []
+        flushed = len(session._testaments.pop(scope, []))
 
         return flushed
 
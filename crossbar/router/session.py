@@ -5,11 +5,10 @@
 #
 #####################################################################################
 
-import os
+from functools import partial
+from itertools import chain
 from pprint import pformat
-from typing import Optional, Union, Dict, List, Type, Any
-
-import werkzeug
+from typing import Optional, Union, Dict, List, Type, Any, Tuple, FrozenSet
 
 import txaio
 
@@ -31,8 +30,7 @@ from crossbar.router.auth import PendingAuth, PendingAuthWampCra, PendingAuthTic
 from crossbar.router.auth import AUTHMETHODS, AUTHMETHOD_MAP
 from crossbar.router.router import Router, RouterFactory
 from crossbar.router import NotAttached
-from crossbar.router.protocol import WampWebSocketServerProtocol, WampRawSocketServerProtocol
-from crossbar.node.native import NativeWorkerClientProtocol
+from crossbar.router.protocol import RouterSessionTransport
 
 from twisted.internet.defer import inlineCallbacks
 from twisted.python.failure import Failure
@@ -53,6 +51,148 @@ except ImportError:
 
 __all__ = ('RouterSessionFactory', )
 
+# pending authentication types which check the signature of a client's AUTHENTICATE (WAMP-Ticket,
+# WAMP-CRA, WAMP-Cryptosign, WAMP-SCRAM), where WAMP-Cryptosign is only available when installed
+_PENDING_AUTH_SIGNATURE_TYPES = tuple(klass for klass in (PendingAuthTicket, PendingAuthWampCra, PendingAuthCryptosign,
+                                                          PendingAuthCryptosignProxy, PendingAuthScram)
+                                      if klass is not None)
+
+# WAMP message type codes dispatched on individually in RouterApplicationSession.send
+_MESSAGE_TYPE_HELLO = message.Hello.MESSAGE_TYPE
+_MESSAGE_TYPE_GOODBYE = message.Goodbye.MESSAGE_TYPE
+_MESSAGE_TYPE_ERROR = message.Error.MESSAGE_TYPE
+
+# generates random WAMP session IDs (for both router embedded and frontend sessions)
+_new_session_id = util.id
+
+# publish options for WAMP meta events that must have been dispatched before proceeding - read-only!
+_ACKNOWLEDGED_PUBLISH = PublishOptions(acknowledge=True)
+
+# close details (without reason or message) shared by all sessions closing without explicit details - read-only!
+_DEFAULT_CLOSE_DETAILS = CloseDetails()
+
+# WAMP message types forwarded by a router embedded session from the application session to the router
+_APP_TO_ROUTER_MESSAGE_TYPES = frozenset({
+    message.Publish.MESSAGE_TYPE,
+    message.Subscribe.MESSAGE_TYPE,
+    message.Unsubscribe.MESSAGE_TYPE,
+    message.Call.MESSAGE_TYPE,
+    message.Yield.MESSAGE_TYPE,
+    message.Register.MESSAGE_TYPE,
+    message.Unregister.MESSAGE_TYPE,
+    message.Cancel.MESSAGE_TYPE,
+})
+
+# WAMP message types forwarded by a router embedded session from the router to the application session
+_ROUTER_TO_APP_MESSAGE_TYPES = frozenset({
+    message.Event.MESSAGE_TYPE,
+    message.Invocation.MESSAGE_TYPE,
+    message.Result.MESSAGE_TYPE,
+    message.Published.MESSAGE_TYPE,
+    message.Subscribed.MESSAGE_TYPE,
+    message.Unsubscribed.MESSAGE_TYPE,
+    message.Registered.MESSAGE_TYPE,
+    message.Unregistered.MESSAGE_TYPE,
+})
+
+# request types of WAMP ERROR messages sent from the application session (as a callee) to the router
+_APP_TO_ROUTER_ERROR_REQUEST_TYPES = frozenset({
+    message.Invocation.MESSAGE_TYPE,
+})
+
+# request types of WAMP ERROR messages sent from the router to the application session
+_ROUTER_TO_APP_ERROR_REQUEST_TYPES = frozenset({
+    message.Call.MESSAGE_TYPE,
+    message.Cancel.MESSAGE_TYPE,
+    message.Register.MESSAGE_TYPE,
+    message.Unregister.MESSAGE_TYPE,
+    message.Publish.MESSAGE_TYPE,
+    message.Subscribe.MESSAGE_TYPE,
+    message.Unsubscribe.MESSAGE_TYPE,
+})
+
+# authmethods for which a frontend session starts pending authentication (WAMP-Anonymous, WAMP-Ticket,
+# WAMP-CRA, WAMP-TLS, WAMP-Cryptosign, WAMP-SCRAM) - router personalities may add further authmethods
+_PENDING_AUTHMETHODS = frozenset({
+    'anonymous',
+    'anonymous-proxy',
+    'ticket',
+    'wampcra',
+    'tls',
+    'cryptosign',
+    'cryptosign-proxy',
+    'scram',
+})
+
+# used as extra authmethods when the router factory has no worker (and hence no personality) - read-only!
+_NO_EXTRA_AUTH_METHODS: Dict[str, Type[PendingAuth]] = {}
+
+# map of id(extra authmethods) -> (extra authmethods, known authmethods, pending authmethods, authmethod classes)
+_AUTHMETHODS_CACHE: Dict[int, Tuple[Dict[str, Type[PendingAuth]], FrozenSet[str], FrozenSet[str],
+                                    Dict[str, Type[PendingAuth]]]] = {}
+
+
+def _get_authmethods(
+    extra_auth_methods: Dict[str, Type[PendingAuth]]
+) -> Tuple[FrozenSet[str], FrozenSet[str], Dict[str, Type[PendingAuth]]]:
+    """
+    Get the authmethods known to and handled by pending authentication in router sessions, and
+    the pending authentication classes of all available authmethods, including the given extra
+    authmethods of a router personality (where the built-in authmethod classes take precedence).
+
+    These are computed once per (personality) extra authmethods map, which is static per personality.
+
+    :param extra_auth_methods: Extra authmethods of the router personality.
+    :return: Tuple ``(known_authmethods, pending_authmethods, authmethod_klasses)`` - read-only!
+    """
+    cached = _AUTHMETHODS_CACHE.get(id(extra_auth_methods), None)
+    if cached is None or cached[0] is not extra_auth_methods:
+        extra = frozenset(extra_auth_methods)
+        cached = (extra_auth_methods, frozenset(AUTHMETHODS) | extra, _PENDING_AUTHMETHODS | extra, {
+            **extra_auth_methods,
+            **AUTHMETHOD_MAP
+        })
+        _AUTHMETHODS_CACHE[id(extra_auth_methods)] = cached
+    return cached[1], cached[2], cached[3]
+
+
+def _extract_cookie(header: str, name: str) -> Optional[str]:
+    """
+    Extract the value of a single cookie from a HTTP cookie header, without running the full
+    (werkzeug) cookie parser on the header in the common case. Headers with quoted cookie values
+    are left to the full parser, since such values may contain cookie separators.
+
+    :param header: HTTP cookie header value, e.g. ``"cbtid=abc; other=def"``.
+    :param name: Name of the cookie to extract.
+    :return: Value of the (first valid) cookie with the given name, or ``None`` if there is no such cookie.
+    """
+    if name not in header:
+        return None
+    if '"' in header:
+        # quoted (and possibly escaped) cookie values are rare, so only import the parser here
+        from werkzeug.http import parse_cookie
+        return parse_cookie(header).get(name, None)
+    for cookie in header.split(';'):
+        key, _, value = cookie.partition('=')
+        if key.strip(' \t') == name:
+            value = value.strip(' \t')
+            # like the full parser, skip invalid cookie values containing whitespace
+            if ' ' not in value and '\t' not in value:
+                return value
+    return None
+
+
+def _is_debug_enabled() -> bool:
+    """
+    Check whether router session loggers currently emit messages at log level ``debug``.
+
+    Arguments to log calls are evaluated eagerly by the caller, even when the logger discards
+    the message, so hot code paths use this to skip computing (highlighted) log arguments.
+    Router session loggers are created without an explicit level, and hence follow the global
+    log level.
+    """
+    return txaio.get_global_log_level() in ('debug', 'trace')
+
 
 class RouterApplicationSession(object):
     """
@@ -61,6 +201,12 @@ class RouterApplicationSession(object):
 
     log = make_logger()
 
+    _EMBEDDED_TRANSPORT_DETAILS = TransportDetails(channel_type=TransportDetails.CHANNEL_TYPE_FUNCTION,
+                                                   channel_framing=TransportDetails.CHANNEL_FRAMING_NATIVE,
+                                                   channel_serializer=TransportDetails.CHANNEL_SERIALIZER_NONE)
+    """
+    Transport details of the "pass-through transport" of router embedded sessions (shared by all of them).
+    """
     def __init__(self,
                  session: ISession,
                  router: Router,
@@ -77,24 +223,22 @@ class RouterApplicationSession(object):
         :param authrole: The fixed/trusted authentication role under which the session will run.
         :param authextra: Optional authentication extra provided to the session.
         :param store: Optional realm store to be used by the session.
+
+        .. note::
+
+            Arguments are not type checked here again, as router embedded sessions are created
+            via :meth:`RouterSessionFactory.add`, which already does so.
         """
-        assert isinstance(session, ApplicationSession), 'session must be of class ApplicationSession, not {}'.format(
-            session.__class__.__name__ if session else type(session))
-        assert isinstance(router, Router), 'router must be of class Router, not {}'.format(
-            router.__class__.__name__ if router else type(router))
-        assert (authid is None or isinstance(authid, str))
-        assert (authrole is None or isinstance(authrole, str))
-        assert (authextra is None or isinstance(authextra, dict))
-
-        self.log.debug(
-            '{func}(session={session}, router={router}, authid="{authid}", authrole="{authrole}", authextra={authextra}, store={store})',
-            func=hltype(RouterApplicationSession.__init__),
-            session=session,
-            router=router,
-            authid=hlid(authid),
-            authrole=hlid(authrole),
-            authextra=authextra,
-            store=store)
+        if _is_debug_enabled():
+            self.log.debug(
+                '{func}(session={session}, router={router}, authid="{authid}", authrole="{authrole}", authextra={authextra}, store={store})',
+                func=hltype(RouterApplicationSession.__init__),
+                session=session,
+                router=router,
+                authid=hlid(authid),
+                authrole=hlid(authrole),
+                authextra=authextra,
+                store=store)
 
         # remember router we are wrapping the app session for
         self._router: Router = router
@@ -102,6 +246,10 @@ class RouterApplicationSession(object):
         # remember wrapped app session
         self._session: ISession = session
 
+        # bound methods used when forwarding messages (on the hot path)
+        self._router_process = router.process
+        self._session_on_message = session.onMessage
+
         # set fake transport on session ("pass-through transport")
         self._session._transport = self
 
@@ -115,13 +263,12 @@ class RouterApplicationSession(object):
         self._authid = authid
         self._authrole = authrole
 
-        self._transport_details = TransportDetails(channel_type=TransportDetails.CHANNEL_TYPE_FUNCTION,
-                                                   channel_framing=TransportDetails.CHANNEL_FRAMING_NATIVE,
-                                                   channel_serializer=TransportDetails.CHANNEL_SERIALIZER_NONE)
+        self._transport_details = self._EMBEDDED_TRANSPORT_DETAILS
 
-        self.log.debug('{func} firing {session}.onConnect() ..',
-                       session=self._session,
-                       func=hltype(RouterApplicationSession.__init__))
+        if _is_debug_enabled():
+            self.log.debug('{func} firing {session}.onConnect() ..',
+                           session=self._session,
+                           func=hltype(RouterApplicationSession.__init__))
 
         # now start firing "connect" observers on the session
         self._session.fire('connect', self._session, self)
@@ -173,6 +320,8 @@ class RouterApplicationSession(object):
 
     @property
     def is_closed(self):
+        # a new (already resolved) future per access: consumers may change the result of the
+        # future they got, which must not leak to other consumers
         return txaio.create_future(result=self)
 
     def close(self):
@@ -186,14 +335,6 @@ class RouterApplicationSession(object):
                 # FIXME
                 # self._session.onLeave(CloseDetails(reason=CloseDetails.REASON_DEFAULT))
 
-                # See also #578; this is to prevent the set() of observers
-                # shrinking while itering in broker.py:329 since the
-                # send() call happens synchronously because this class is
-                # acting as ITransport and the send() can result in an
-                # immediate disconnect which winds up right here...so we
-                # take at trip through the reactor loop.
-                from twisted.internet import reactor
-
                 def detach(sess):
                     try:
                         self._router.detach(sess)
@@ -203,7 +344,17 @@ class RouterApplicationSession(object):
                     except Exception:
                         self.log.failure()
 
-                reactor.callLater(0, detach, self._session)
+                # See also #578; this is to prevent the set() of observers
+                # shrinking while itering in broker.py:329 since the
+                # send() call happens synchronously because this class is
+                # acting as ITransport and the send() can result in an
+                # immediate disconnect which winds up right here...so we
+                # take at trip through the reactor loop - but only if the
+                # router is actually delivering messages or detaching right now.
+                if self._router._in_broadcast:
+                    self._router._factory._reactor.callLater(0, detach, self._session)
+                else:
+                    detach(self._session)
             else:
                 self.log.warn(
                     '{klass}.close: router embedded session "{session_id}" not attached to router realm "{realm}" (skipping detaching of session)',
@@ -218,22 +369,136 @@ class RouterApplicationSession(object):
 
         if self._store:
             # FIXME
-            close_details = CloseDetails()
-            self._store.store_session_left(self._session, close_details)
+            self._store.store_session_left(self._session, _DEFAULT_CLOSE_DETAILS)
 
     def abort(self):
         """
         Implements :func:`autobahn.wamp.interfaces.ITransport.abort`
         """
 
+    @inlineCallbacks
+    def _fire_join_ready(self, details: SessionDetails):
+        """
+        Fire "join", ``onJoin`` and "ready" on the wrapped application session. Errors in
+        any of these are logged (or handed to the session), and do not stop the next step.
+        """
+        session = self._session
+
+        try:
+            yield session.fire('join', session, details)
+        except Exception:
+            self._log_error(Failure(), "While notifying 'join'")
+
+        try:
+            yield txaio.as_future(session.onJoin, details)
+        except Exception:
+            self._swallow_error(Failure(), "While firing onJoin")
+
+        try:
+            yield session.fire('ready', session)
+        except Exception:
+            self._log_error(Failure(), "While notifying 'ready'")
+
+        if _is_debug_enabled():
+            self.log.debug('{func} fired {session} "join" and "ready" events with details={details})',
+                           session=session,
+                           details=details,
+                           func=hltype(RouterApplicationSession.send))
+
+    @inlineCallbacks
+    def _do_goodbye(self, details: CloseDetails):
+        """
+        Fire ``onLeave``, "leave" and "disconnect" on the wrapped application session after it
+        said GOODBYE, and publish the session leave WAMP meta event.
+        """
+        session = self._session
+
+        try:
+            yield session.onLeave(details)
+        except Exception:
+            self._log_error(Failure(), "While firing onLeave")
+
+        # FIXME: I _think_ this is no longer needed / desirable, as it
+        # seems to lead to a duplicate call into close()
+        # if session._transport:
+        #     session._transport.close()
+
+        try:
+            yield session.fire('leave', session, details)
+        except Exception:
+            self._log_error(Failure(), "While notifying 'leave'")
+
+        try:
+            yield session.fire('disconnect', session)
+        except Exception:
+            self._log_error(Failure(), "While notifying 'disconnect'")
+
+        if self._router._realm.session:
+            try:
+                # publish management API v1 event
+                yield self._router._realm.session.publish('wamp.session.on_leave',
+                                                          session._session_id,
+                                                          options=_ACKNOWLEDGED_PUBLISH)
+                # # publish management API v2 event
+                # session_info_long = {
+                #     'session': session._session_id,
+                #     'authid': session._authid,
+                #     'authrole': session._authrole,
+                #     'authmethod': session._authmethod,
+                #     'authextra': session._authextra,
+                #     'authprovider': session._authprovider,
+                #     'transport': None,
+                # }
+                # yield self._router._realm.session.publish(
+                #     'wamp.session.on_leave_v2',
+                #     session._session_id,
+                #     session_info_long,
+                #     options=PublishOptions(acknowledge=True)
+                # )
+            except:
+                self.log.failure()
+
     def send(self, msg):
         """
         Implements :func:`autobahn.wamp.interfaces.ITransport.send`
         """
-        if isinstance(msg, message.Hello):
+        # dispatch on the WAMP message type code rather than probing isinstance() for
+        # every message class, as this is on the hot path for all router embedded sessions,
+        # and test for the messages forwarded between app session and router first
+        mt = msg.MESSAGE_TYPE
+
+        # app-to-router
+        #
+        if mt in _APP_TO_ROUTER_MESSAGE_TYPES:
+
+            # deliver message to router
+            #
+            self._router_process(self._session, msg)
+
+        # router-to-app
+        #
+        elif mt in _ROUTER_TO_APP_MESSAGE_TYPES:
+
+            # deliver message to app session
+            #
+            self._session_on_message(msg)
+
+        # app-to-router error (from callee)
+        #
+        elif mt == _MESSAGE_TYPE_ERROR and msg.request_type in _APP_TO_ROUTER_ERROR_REQUEST_TYPES:
+            self._router_process(self._session, msg)
+
+        # router-to-app error
+        #
+        elif mt == _MESSAGE_TYPE_ERROR and msg.request_type in _ROUTER_TO_APP_ERROR_REQUEST_TYPES:
+            self._session_on_message(msg)
+
+        # opening handshake (once per session)
+        #
+        elif mt == _MESSAGE_TYPE_HELLO:
 
             # fake session ID assignment (normally done in WAMP opening handshake)
-            self._session._session_id = util.id()
+            self._session._session_id = _new_session_id()
 
             # set fixed/trusted authentication information
             self._session._authid = self._trusted_authid
@@ -262,123 +527,28 @@ class RouterApplicationSession(object):
             # add app session to router
             self._router.attach(self._session)
 
-            self.log.debug(
-                '{func} attached {session} to realm={realm} with credentials session_id={session_id}, authid={authid}, authrole={authrole} using authmethod={authmethod}',
-                session=self._session,
-                session_id=self._session._session_id,
-                realm=self._session._realm,
-                authid=hlid(self._session._authid),
-                authrole=hlid(self._session._authrole),
-                authmethod=hl(self._session._authmethod),
-                func=hltype(RouterApplicationSession.send))
+            if _is_debug_enabled():
+                self.log.debug(
+                    '{func} attached {session} to realm={realm} with credentials session_id={session_id}, authid={authid}, authrole={authrole} using authmethod={authmethod}',
+                    session=self._session,
+                    session_id=self._session._session_id,
+                    realm=self._session._realm,
+                    authid=hlid(self._session._authid),
+                    authrole=hlid(self._session._authrole),
+                    authmethod=hl(self._session._authmethod),
+                    func=hltype(RouterApplicationSession.send))
 
             # fake app session open
 
             # have to fire the 'join' notification ourselves, as we're
             # faking out what the protocol usually does.
-            d = self._session.fire('join', self._session, sd)
-            d.addErrback(lambda fail: self._log_error(fail, "While notifying 'join'"))
-            # now fire onJoin (since _log_error returns None, we'll be
-            # back in the callback chain even on errors from 'join'
-            d.addCallback(lambda _: txaio.as_future(self._session.onJoin, sd))
-            d.addErrback(lambda fail: self._swallow_error(fail, "While firing onJoin"))
-
-            d.addCallback(lambda _: self._session.fire('ready', self._session))
-            d.addErrback(lambda fail: self._log_error(fail, "While notifying 'ready'"))
-
-            d.addCallback(
-                lambda _: self.log.debug('{func} fired {session} "join" and "ready" events with details={details})',
-                                         session=self._session,
-                                         details=sd,
-                                         func=hltype(RouterApplicationSession.send)))
-
-        # app-to-router
-        #
-        elif (isinstance(msg, (message.Publish, message.Subscribe, message.Unsubscribe, message.Call, message.Yield,
-                               message.Register, message.Unregister, message.Cancel))
-              or (isinstance(msg, message.Error) and msg.request_type == message.Invocation.MESSAGE_TYPE)):
-
-            # deliver message to router
-            #
-            self._router.process(self._session, msg)
-
-        # router-to-app
-        #
-        elif isinstance(msg, (message.Event,
-                              message.Invocation,
-                              message.Result,
-                              message.Published,
-                              message.Subscribed,
-                              message.Unsubscribed,
-                              message.Registered,
-                              message.Unregistered)) or \
-            (isinstance(msg, message.Error) and (msg.request_type in {
-                message.Call.MESSAGE_TYPE,
-                message.Cancel.MESSAGE_TYPE,
-                message.Register.MESSAGE_TYPE,
-                message.Unregister.MESSAGE_TYPE,
-                message.Publish.MESSAGE_TYPE,
-                message.Subscribe.MESSAGE_TYPE,
-                message.Unsubscribe.MESSAGE_TYPE})):
-
-            # deliver message to app session
-            #
-            self._session.onMessage(msg)
+            d = self._fire_join_ready(sd)
+            d.addErrback(lambda fail: self._log_error(fail, "Internal error"))
 
         # ignore messages
         #
-        elif isinstance(msg, message.Goodbye):
-            details = CloseDetails(msg.reason, msg.message)
-            session = self._session
-
-            @inlineCallbacks
-            def do_goodbye():
-                try:
-                    yield session.onLeave(details)
-                except Exception:
-                    self._log_error(Failure(), "While firing onLeave")
-
-                # FIXME: I _think_ this is no longer needed / desirable, as it
-                # seems to lead to a duplicate call into close()
-                # if session._transport:
-                #     session._transport.close()
-
-                try:
-                    yield session.fire('leave', session, details)
-                except Exception:
-                    self._log_error(Failure(), "While notifying 'leave'")
-
-                try:
-                    yield session.fire('disconnect', session)
-                except Exception:
-                    self._log_error(Failure(), "While notifying 'disconnect'")
-
-                if self._router._realm.session:
-                    try:
-                        # publish management API v1 event
-                        yield self._router._realm.session.publish('wamp.session.on_leave',
-                                                                  session._session_id,
-                                                                  options=PublishOptions(acknowledge=True))
-                        # # publish management API v2 event
-                        # session_info_long = {
-                        #     'session': session._session_id,
-                        #     'authid': session._authid,
-                        #     'authrole': session._authrole,
-                        #     'authmethod': session._authmethod,
-                        #     'authextra': session._authextra,
-                        #     'authprovider': session._authprovider,
-                        #     'transport': None,
-                        # }
-                        # yield self._router._realm.session.publish(
-                        #     'wamp.session.on_leave_v2',
-                        #     session._session_id,
-                        #     session_info_long,
-                        #     options=PublishOptions(acknowledge=True)
-                        # )
-                    except:
-                        self.log.failure()
-
-            d = do_goodbye()
+        elif mt == _MESSAGE_TYPE_GOODBYE:
+            d = self._do_goodbye(CloseDetails(msg.reason, msg.message))
             d.addErrback(lambda fail: self._log_error(fail, "Internal error"))
 
         else:
@@ -392,6 +562,35 @@ class RouterSession(BaseSession):
     WAMP router session. This class implements :class:`autobahn.wamp.interfaces.ITransportHandler`.
     """
 
+    # per-session state kept in slots (instances still have a __dict__ as BaseSession is not slotted)
+    __slots__ = (
+        'factory',
+        '_transport',
+        '_transport_config',
+        '_transport_is_closing',
+        '_router_factory',
+        '_router',
+        '_realm',
+        '_service_session',
+        '_session_id',
+        '_pending_session_id',
+        '_previous_session_id',
+        '_session_roles',
+        '_session_details',
+        '_session_info_short',
+        '_pending_auth',
+        '_authid',
+        '_authrole',
+        '_authmethod',
+        '_authprovider',
+        '_authextra',
+        '_goodbye_sent',
+        '_testaments',
+        '_stats_enabled',
+        '_stats_has_triggered_first',
+        '_stats_trigger_on_leave',
+    )
+
     log = make_logger()
 
     def __init__(self, router_factory: RouterFactory):
@@ -401,26 +600,27 @@ class RouterSession(BaseSession):
             the :class:`crossbar.router.session.RouterSessionFactory` stored in ``self.factory``.
         """
         super(RouterSession, self).__init__()
-        self._transport: Optional[Union[WampWebSocketServerProtocol, WampRawSocketServerProtocol,
-                                        NativeWorkerClientProtocol]] = None
+        self._transport: Optional[RouterSessionTransport] = None
         self._router_factory = router_factory
         self._router = None
         self._realm = None
-        self._testaments: Dict[str, List[message.Message]] = {"destroyed": [], "detached": []}
+        # map: testament scope ("destroyed" or "detached") -> testament PUBLISH messages, where
+        # the lists are only created when the first testament is added (most sessions have none)
+        self._testaments: Dict[str, List[message.Message]] = {}
         self._goodbye_sent = False
         self._transport_is_closing = False
         self._session_details = None
+        self._session_info_short = None
         self._service_session = None
 
-    def onOpen(self, transport: Union[WampWebSocketServerProtocol, WampRawSocketServerProtocol,
-                                      NativeWorkerClientProtocol, MagicMock]):
+    def onOpen(self, transport: Union[RouterSessionTransport, MagicMock]):
         """
         Implements :func:`autobahn.wamp.interfaces.ITransportHandler.onOpen`
         """
         # this is a WAMP transport instance
         assert isinstance(transport,
-                          (WampWebSocketServerProtocol, WampRawSocketServerProtocol, NativeWorkerClientProtocol,
-                           MagicMock)), 'unexpected router transport type {}'.format(type(transport))
+                          (RouterSessionTransport, MagicMock)), 'unexpected router transport type {}'.format(
+                              type(transport))
         self._transport = transport
 
         # transport configuration
@@ -436,6 +636,7 @@ class RouterSession(BaseSession):
         self._session_id = None
         self._session_roles = None
         self._session_details = None
+        self._session_info_short = None
 
         # session authentication information
         self._pending_auth = None
@@ -455,82 +656,7 @@ class RouterSession(BaseSession):
         if self._session_id is None:
 
             if not self._pending_session_id:
-                self._pending_session_id = util.id()
-
-            def welcome(realm,
-                        authid=None,
-                        authrole=None,
-                        authmethod=None,
-                        authprovider=None,
-                        authextra=None,
-                        custom=None):
-                self.log.debug(
-                    '{func} realm="{realm}", authid="{authid}", authrole="{authrole}", authmethod={authmethod}, authprovider={authprovider}, authextra={authextra}',
-                    realm=hlid(realm),
-                    authid=hlid(authid),
-                    authrole=hlid(authrole),
-                    authmethod=hlval(authmethod),
-                    authprovider=hlval(authprovider),
-                    authextra=pformat(authextra) if authextra else None,
-                    func=hltype(welcome))
-                self._realm = realm
-                self._session_id = self._pending_session_id
-                self._pending_session_id = None
-                self._goodbye_sent = False
-
-                self._router = self._router_factory.get(realm)
-                if not self._router:
-                    # should not arrive here
-                    raise Exception("logic error (no realm at a stage were we should have one)")
-
-                self._authid = authid
-                self._authrole = authrole
-                self._authmethod = authmethod
-                self._authprovider = authprovider
-                self._authextra = authextra or {}
-
-                self._authextra['x_cb_node'] = custom.get('x_cb_node', None)
-                self._authextra['x_cb_worker'] = custom.get('x_cb_worker', None)
-                self._authextra['x_cb_peer'] = custom.get('x_cb_peer', None)
-                self._authextra['x_cb_pid'] = custom.get('x_cb_pid', None)
-
-                # add the new session (after WAMP handshake and authentication is complete)
-                # to the router for this realm
-                roles = self._router.attach(self)
-
-                msg = message.Welcome(self._session_id,
-                                      roles,
-                                      realm=realm,
-                                      authid=authid,
-                                      authrole=authrole,
-                                      authmethod=authmethod,
-                                      authprovider=authprovider,
-                                      authextra=self._authextra,
-                                      custom=custom)
-                self._transport.send(msg)
-
-                # expose incoming frontend transport of proxy
-                # rather than proxy-router transport details
-                if 'transport' in self._authextra:
-                    td = TransportDetails.parse(self._authextra.pop('transport'))
-                else:
-                    td = self._transport.transport_details
-
-                session_details = SessionDetails(
-                    realm=self._realm,
-                    session=self._session_id,
-                    authid=self._authid,
-                    authrole=self._authrole,
-                    authmethod=self._authmethod,
-                    authprovider=self._authprovider,
-                    authextra=self._authextra,
-                    serializer=td.channel_serializer,
-                    # FIXME: for resumable session feature
-                    resumed=False,
-                    resumable=False,
-                    resume_token=None,
-                    transport=td)
-                self.onJoin(session_details)
+                self._pending_session_id = _new_session_id()
 
             # the first message MUST be HELLO
             if isinstance(msg, message.Hello):
@@ -545,89 +671,29 @@ class RouterSession(BaseSession):
                                        session_roles=msg.roles,
                                        pending_session=self._pending_session_id)
 
-                d = txaio.as_future(self.onHello, msg.realm, details)
-
-                def onHello_success(res):
-                    self.log.debug('{func}::_on_success(res={res})', func=hltype(self.onMessage), res=res)
-                    msg = None
-                    # it is possible this session has disconnected
-                    # while onHello was taking place
-                    if self._transport is None:
-                        self.log.info("Client session disconnected during authentication", )
+                on_hello = self.onHello
+                if getattr(on_hello, '__func__', None) is RouterSession.onHello:
+                    # the default onHello() handles all errors itself, and returns the result right
+                    # away unless authentication is asynchronous (e.g. dynamic authenticators)
+                    res = on_hello(msg.realm, details)
+                    if not txaio.is_future(res):
+                        try:
+                            self._on_hello_success(res)
+                        except Exception:
+                            self._on_hello_error(txaio.create_failure(), realm=msg.realm, details=details)
                         return
-
-                    if isinstance(res, Accept):
-                        custom = {
-                            'x_cb_node': self._router_factory._node_id,
-                            'x_cb_worker': self._router_factory._worker_id,
-                            'x_cb_peer': str(self._transport.peer),
-                            'x_cb_pid': os.getpid(),
-                        }
-                        welcome(res.realm, res.authid, res.authrole, res.authmethod, res.authprovider, res.authextra,
-                                custom)
-
-                    elif isinstance(res, Challenge):
-                        msg = message.Challenge(res.method, res.extra)
-
-                    elif isinstance(res, Deny):
-                        msg = message.Abort(res.reason, res.message)
-
-                    else:
-                        pass
-
-                    if msg:
-                        self._transport.send(msg)
-
-                def onHello_error(err):
-                    self.log.warn(
-                        '{func}.onMessage(..)::onHello(realm="{realm}", details={details}) failed with {err}',
-                        func=hltype(self.onMessage),
-                        realm=msg.realm,
-                        details=details,
-                        err=err)
-                    return self._swallow_error_and_abort(err)
-
-                txaio.add_callbacks(d, onHello_success, onHello_error)
+                    d = res
+                else:
+                    d = txaio.as_future(on_hello, msg.realm, details)
+                # errors processing the result (e.g. when joining the session) are handled like
+                # errors of onHello() itself, as in the synchronous case above
+                txaio.add_callbacks(d, self._on_hello_success, None)
+                txaio.add_callbacks(d, None, partial(self._on_hello_error, realm=msg.realm, details=details))
 
             elif isinstance(msg, message.Authenticate):
 
                 d = txaio.as_future(self.onAuthenticate, msg.signature, {})
-
-                def onAuthenticate_success(res):
-                    msg = None
-                    # it is possible this session has disconnected
-                    # while authentication was taking place
-                    if self._transport is None:
-                        self.log.info("Client session disconnected during authentication", )
-                        return
-
-                    if isinstance(res, Accept):
-                        custom = {
-                            'x_cb_node': self._router_factory._node_id,
-                            'x_cb_worker': self._router_factory._worker_id,
-                            'x_cb_peer': str(self._transport.peer),
-                            'x_cb_pid': os.getpid(),
-                        }
-                        welcome(res.realm, res.authid, res.authrole, res.authmethod, res.authprovider, res.authextra,
-                                custom)
-
-                    elif isinstance(res, Deny):
-                        msg = message.Abort(res.reason, res.message)
-
-                    else:
-                        pass
-
-                    if msg:
-                        self._transport.send(msg)
-
-                def onAuthenticate_error(err):
-                    self.log.warn('{func}.onMessage(..)::onAuthenticate(..) failed with {err}',
-                                  func=hltype(self.onMessage),
-                                  err=err)
-                    self.log.failure(err)
-                    return self._swallow_error_and_abort(err)
-
-                txaio.add_callbacks(d, onAuthenticate_success, onAuthenticate_error)
+                txaio.add_callbacks(d, self._on_authenticate_success, self._on_authenticate_error)
 
             elif isinstance(msg, message.Abort):
 
@@ -641,8 +707,10 @@ class RouterSession(BaseSession):
                 # self._transport.close()
 
             else:
-                msg = "{} message received while session is not yet joined".format(str(msg.__class__.__name__).upper())
-                self.log.debug('{func} {msg}', func=hltype(self.onMessage), msg=msg)
+                if _is_debug_enabled():
+                    msg = "{} message received while session is not yet joined".format(
+                        str(msg.__class__.__name__).upper())
+                    self.log.debug('{func} {msg}', func=hltype(self.onMessage), msg=msg)
                 # raise ProtocolError(msg)
 
         else:
@@ -705,6 +773,164 @@ class RouterSession(BaseSession):
                 # let the actual wamp router handle all other wamp messages ..
                 self._router.process(self, msg)
 
+    def _welcome(self,
+                 realm,
+                 authid=None,
+                 authrole=None,
+                 authmethod=None,
+                 authprovider=None,
+                 authextra=None,
+                 custom=None):
+        if _is_debug_enabled():
+            self.log.debug(
+                '{func} realm="{realm}", authid="{authid}", authrole="{authrole}", authmethod={authmethod}, authprovider={authprovider}, authextra={authextra}',
+                realm=hlid(realm),
+                authid=hlid(authid),
+                authrole=hlid(authrole),
+                authmethod=hlval(authmethod),
+                authprovider=hlval(authprovider),
+                authextra=pformat(authextra) if authextra else None,
+                func=hltype(self._welcome))
+        self._realm = realm
+        self._session_id = self._pending_session_id
+        self._pending_session_id = None
+        self._goodbye_sent = False
+
+        self._router = self._router_factory.get(realm)
+        if not self._router:
+            # should not arrive here
+            raise Exception("logic error (no realm at a stage were we should have one)")
+
+        self._authid = authid
+        self._authrole = authrole
+        self._authmethod = authmethod
+        self._authprovider = authprovider
+        self._authextra = authextra or {}
+
+        # custom carries exactly the x_cb_node, x_cb_worker, x_cb_peer and x_cb_pid attributes
+        self._authextra.update(custom)
+
+        # add the new session (after WAMP handshake and authentication is complete)
+        # to the router for this realm
+        roles = self._router.attach(self)
+
+        msg = message.Welcome(self._session_id,
+                              roles,
+                              realm=realm,
+                              authid=authid,
+                              authrole=authrole,
+                              authmethod=authmethod,
+                              authprovider=authprovider,
+                              authextra=self._authextra,
+                              custom=custom)
+        self._transport.send(msg)
+
+        # expose incoming frontend transport of proxy
+        # rather than proxy-router transport details
+        if 'transport' in self._authextra:
+            td = TransportDetails.parse(self._authextra.pop('transport'))
+        else:
+            td = self._transport.transport_details
+
+        session_details = SessionDetails(
+            realm=self._realm,
+            session=self._session_id,
+            authid=self._authid,
+            authrole=self._authrole,
+            authmethod=self._authmethod,
+            authprovider=self._authprovider,
+            authextra=self._authextra,
+            serializer=td.channel_serializer,
+            # FIXME: for resumable session feature
+            resumed=False,
+            resumable=False,
+            resume_token=None,
+            transport=td)
+        self.onJoin(session_details)
+
+    def _accept(self, res: Accept):
+        custom = self._router_factory._welcome_custom.copy()
+        custom['x_cb_peer'] = str(self._transport.peer)
+        self._welcome(res.realm, res.authid, res.authrole, res.authmethod, res.authprovider, res.authextra, custom)
+
+    def _challenge(self, res: Challenge):
+        self._transport.send(message.Challenge(res.method, res.extra))
+
+    def _deny(self, res: Deny):
+        self._transport.send(message.Abort(res.reason, res.message))
+
+    def _on_hello_success(self, res):
+        if _is_debug_enabled():
+            self.log.debug('{func}::_on_success(res={res})', func=hltype(self.onMessage), res=res)
+
+        # it is possible this session has disconnected
+        # while onHello was taking place
+        if self._transport is None:
+            self.log.info("Client session disconnected during authentication", )
+            return
+
+        self._handle_auth_result(res, self._HELLO_RESULT_HANDLERS)
+
+    def _on_hello_error(self, err, realm, details):
+        self.log.warn('{func}.onMessage(..)::onHello(realm="{realm}", details={details}) failed with {err}',
+                      func=hltype(self.onMessage),
+                      realm=realm,
+                      details=details,
+                      err=err)
+        return self._swallow_error_and_abort(err)
+
+    def _on_authenticate_success(self, res):
+        # it is possible this session has disconnected
+        # while authentication was taking place
+        if self._transport is None:
+            self.log.info("Client session disconnected during authentication", )
+            return
+
+        self._handle_auth_result(res, self._AUTHENTICATE_RESULT_HANDLERS)
+
+    def _on_authenticate_error(self, err):
+        self.log.warn('{func}.onMessage(..)::onAuthenticate(..) failed with {err}',
+                      func=hltype(self.onMessage),
+                      err=err)
+        self.log.failure(err)
+        return self._swallow_error_and_abort(err)
+
+    # handlers for the result of onHello() and onAuthenticate(), by result type
+    _HELLO_RESULT_HANDLERS = {Accept: _accept, Challenge: _challenge, Deny: _deny}
+    _AUTHENTICATE_RESULT_HANDLERS = {Accept: _accept, Deny: _deny}
+
+    def _handle_auth_result(self, res, handlers):
+        handler = handlers.get(type(res), None)
+        if handler is None:
+            # overridden onHello() or onAuthenticate() may return subclasses of the result types
+            for klass, klass_handler in handlers.items():
+                if isinstance(res, klass):
+                    handler = klass_handler
+                    break
+            else:
+                self.log.warn('{func}: ignoring unexpected authentication result {res}',
+                              func=hltype(self.onMessage),
+                              res=res)
+                return
+        handler(self, res)
+
+    def _get_session_info_short(self) -> Dict[str, Any]:
+        """
+        Get the short session information published with WAMP session statistics events.
+
+        This is (a copy of) the information remembered when the session joined, unless the session
+        has left since (or never joined). Embedded subscribers receive the published dict as is, so
+        every event gets its own.
+        """
+        if self._session_info_short is not None and self._session_info_short['session'] == self._session_id:
+            return dict(self._session_info_short)
+        return {
+            'session': self._session_id,
+            'realm': self._realm,
+            'authid': self._authid,
+            'authrole': self._authrole,
+        }
+
     # noinspection PyUnusedLocal
     def onClose(self, wasClean):
         """
@@ -714,12 +940,7 @@ class RouterSession(BaseSession):
 
         # publish final serializer stats for WAMP client connection being closed
         if self._service_session:
-            session_info_short = {
-                'session': self._session_id,
-                'realm': self._realm,
-                'authid': self._authid,
-                'authrole': self._authrole,
-            }
+            session_info_short = self._get_session_info_short()
 
             session_stats = self._transport._serializer.stats()
             session_stats['first'] = False
@@ -733,16 +954,15 @@ class RouterSession(BaseSession):
         # fire callback and close the transport
         if self._session_id:
             try:
-                self.onLeave(CloseDetails())
+                self.onLeave(_DEFAULT_CLOSE_DETAILS)
             except Exception:
                 self.log.failure("Exception raised in onLeave callback")
-                self.log.warn("{tb}".format(tb=Failure().getTraceback()))
 
             try:
                 self._router.detach(self)
-            except Exception as e:
-                self.log.error("Failed to detach session '{}': {}".format(self._session_id, e))
-                self.log.warn("{tb}".format(tb=Failure().getTraceback()))
+            except Exception:
+                self.log.failure("Failed to detach session '{session_id}': {log_failure.value}",
+                                 session_id=self._session_id)
 
             self._session_id = None
 
@@ -798,24 +1018,26 @@ class RouterSession(BaseSession):
 
         try:
             # allow "Personality" classes to add authmethods
-            extra_auth_methods = dict()
+            extra_auth_methods = _NO_EXTRA_AUTH_METHODS
             if self._router_factory._worker:
                 personality = self._router_factory._worker.personality
                 extra_auth_methods = personality.EXTRA_AUTH_METHODS
+            known_authmethods, pending_authmethods, authmethod_klasses = _get_authmethods(extra_auth_methods)
 
             # default authentication method is "WAMP-Anonymous" if client doesn't specify otherwise
             authmethods = details.authmethods or ['anonymous']
             authextra = details.authextra
 
-            self.log.debug('{func} processing authmethods={authmethods}, authextra={authextra}',
-                           func=hltype(self.onHello),
-                           authextra=authextra,
-                           authmethods=authmethods)
+            if _is_debug_enabled():
+                self.log.debug('{func} processing authmethods={authmethods}, authextra={authextra}',
+                               func=hltype(self.onHello),
+                               authextra=authextra,
+                               authmethods=authmethods)
 
             assert self._transport
 
             # if the client had a reassigned realm during authentication, restore it from the cookie
-            if hasattr(self._transport, '_authrealm') and self._transport._authrealm:
+            if self._transport._authrealm:
                 if 'cookie' in authmethods:
                     realm = self._transport._authrealm
                     authextra = self._transport._authextra
@@ -824,18 +1046,19 @@ class RouterSession(BaseSession):
                     self._transport._authmethod = None
                     self._transport._authrealm = None
                     self._transport._authid = None
-                    if hasattr(self._transport, '_cbtid'):
+                    if self._transport._cbtid:
                         self._transport.factory._cookiestore.setAuth(self._transport._cbtid, None, None, None, None,
                                                                      None)
-                        self.log.debug(
-                            '{meth}: cookiestore.setAuth[1](cbtid={cbtid}, authid={authid}, authrole={authrole}, authmethod={authmethod}, authextra={authextra}, realm={realm})',
-                            meth=hltype(self.onHello),
-                            cbtid=hlid(self._transport._cbtid),
-                            authid=None,
-                            authrole=None,
-                            authmethod=None,
-                            authextra=None,
-                            realm=None)
+                        if _is_debug_enabled():
+                            self.log.debug(
+                                '{meth}: cookiestore.setAuth[1](cbtid={cbtid}, authid={authid}, authrole={authrole}, authmethod={authmethod}, authextra={authextra}, realm={realm})',
+                                meth=hltype(self.onHello),
+                                cbtid=hlid(self._transport._cbtid),
+                                authid=None,
+                                authrole=None,
+                                authmethod=None,
+                                authextra=None,
+                                realm=None)
 
                 else:
                     pass  # TLS authentication is not revoked here
@@ -887,19 +1110,14 @@ class RouterSession(BaseSession):
 
                     # we ignore any details.authid the client might have announced, and use
                     # a cookie value or a random value
-                    if hasattr(self._transport, "_cbtid") and self._transport._cbtid:
+                    if self._transport._cbtid:
                         # if cookie tracking is enabled, set authid to cookie value
                         authid = self._transport._cbtid
                     else:
                         # if no cookie tracking, generate a random value for authid
                         authid = util.generate_serial_number()
 
-                    pending_auth_klass: Type[PendingAuth]
-                    if authmethod in AUTHMETHOD_MAP:
-                        pending_auth_klass = AUTHMETHOD_MAP[authmethod]
-                    else:
-                        pending_auth_klass = extra_auth_methods[authmethod]
-                    assert pending_auth_klass
+                    pending_auth_klass = authmethod_klasses[authmethod]
                     assert self._pending_session_id
 
                     self._pending_auth = pending_auth_klass(self._pending_session_id,
@@ -916,8 +1134,8 @@ class RouterSession(BaseSession):
                     for authmethod in authmethods:
 
                         # invalid authmethod
-                        if authmethod not in AUTHMETHODS and authmethod not in extra_auth_methods:
-                            self.log.debug("Unknown authmethod: {}".format(authmethod))
+                        if authmethod not in known_authmethods:
+                            self.log.debug('Unknown authmethod: {authmethod}', authmethod=authmethod)
                             return Deny(message='invalid authmethod "{}"'.format(authmethod))
 
                         # authmethod not configured
@@ -928,31 +1146,16 @@ class RouterSession(BaseSession):
                             continue
 
                         # authmethod not available
-                        if authmethod not in AUTHMETHOD_MAP and authmethod not in extra_auth_methods:
+                        pending_auth_klass_2 = authmethod_klasses.get(authmethod, None)
+                        if pending_auth_klass_2 is None:
                             self.log.debug(
                                 "client requested valid, but unavailable authentication method {authmethod}",
                                 authmethod=authmethod)
                             continue
 
                         # WAMP-Anonymous, WAMP-Ticket, WAMP-CRA, WAMP-TLS, WAMP-Cryptosign
-                        # WAMP-SCRAM
-                        pending_auth_methods = [
-                            'anonymous',
-                            'anonymous-proxy',
-                            'ticket',
-                            'wampcra',
-                            'tls',
-                            'cryptosign',
-                            'cryptosign-proxy',
-                            'scram',
-                        ] + list(extra_auth_methods.keys())
-                        if authmethod in pending_auth_methods:
-                            pending_auth_klass_2: Type[PendingAuth]
-                            if authmethod in AUTHMETHOD_MAP:
-                                pending_auth_klass_2 = AUTHMETHOD_MAP[authmethod]
-                            else:
-                                pending_auth_klass_2 = extra_auth_methods[authmethod]
-                            assert pending_auth_klass_2
+                        # WAMP-SCRAM, and authmethods added by the personality
+                        if authmethod in pending_authmethods:
                             assert self._pending_session_id
 
                             self._pending_auth = pending_auth_klass_2(
@@ -968,10 +1171,7 @@ class RouterSession(BaseSession):
                             cbtid = None
                             _ti = self._transport.transport_details.http_headers_received
                             if 'set-cookie' in _ti:
-                                cookie_name = 'cbtid'
-                                cookie_received = werkzeug.http.parse_cookie(_ti['set-cookie'])
-                                if cookie_name in cookie_received:
-                                    cbtid = cookie_received[cookie_name]
+                                cbtid = _extract_cookie(_ti['set-cookie'], 'cbtid')
 
                             if cbtid:
                                 if self._transport.factory._cookiestore.exists(cbtid):
@@ -993,10 +1193,11 @@ class RouterSession(BaseSession):
                                                   authprovider='cookie',
                                                   authextra=_cookie_authextra)
                                 else:
-                                    self.log.debug(
-                                        '{func}: received cookie for cbtid={cbtid} not authenticated before',
-                                        func=hltype(self.onHello),
-                                        cbtid=hlid(cbtid))
+                                    if _is_debug_enabled():
+                                        self.log.debug(
+                                            '{func}: received cookie for cbtid={cbtid} not authenticated before',
+                                            func=hltype(self.onHello),
+                                            cbtid=hlid(cbtid))
                                     continue
                             else:
                                 # the client requested cookie authentication, but there is 1) no cookie set,
@@ -1004,7 +1205,8 @@ class RouterSession(BaseSession):
                                 # a different auth method (if it had been, we would never have entered here, since then
                                 # auth info would already have been extracted from the transport)
                                 # consequently, we skip this auth method and move on to next auth method.
-                                self.log.debug('{func}: no cookie set for cbtid', func=hltype(self.onHello))
+                                if _is_debug_enabled():
+                                    self.log.debug('{func}: no cookie set for cbtid', func=hltype(self.onHello))
                                 continue
 
                         else:
@@ -1033,12 +1235,8 @@ class RouterSession(BaseSession):
             # of how to check depend on the authentication method
             if self._pending_auth:
 
-                # WAMP-Ticket, WAMP-CRA, WAMP-Cryptosign
-                if (isinstance(self._pending_auth, PendingAuthTicket)
-                        or isinstance(self._pending_auth, PendingAuthWampCra)
-                        or isinstance(self._pending_auth, PendingAuthCryptosign)
-                        or isinstance(self._pending_auth, PendingAuthCryptosignProxy)
-                        or isinstance(self._pending_auth, PendingAuthScram)):
+                # WAMP-Ticket, WAMP-CRA, WAMP-Cryptosign, WAMP-SCRAM
+                if isinstance(self._pending_auth, _PENDING_AUTH_SIGNATURE_TYPES):
                     return self._pending_auth.authenticate(signature)
 
                 # should not arrive here: logic error
@@ -1054,19 +1252,20 @@ class RouterSession(BaseSession):
             return Deny(message='internal error: {}'.format(e))
 
     def onJoin(self, details: SessionDetails):
-        if self._transport and hasattr(self._transport, '_cbtid') and self._transport._cbtid:
+        if self._transport and self._transport._cbtid:
             if details.authmethod != 'cookie':
                 self._transport.factory._cookiestore.setAuth(self._transport._cbtid, details.authid, details.authrole,
                                                              details.authmethod, details.authextra, self._realm)
-                self.log.debug(
-                    '{meth}: cookiestore.setAuth[2](cbtid={cbtid}, authid={authid}, authrole={authrole}, authmethod={authmethod}, authextra={authextra}, realm={realm})',
-                    meth=hltype(self.onJoin),
-                    cbtid=hlid(self._transport._cbtid),
-                    authid=hlid(details.authid),
-                    authrole=hlid(details.authrole),
-                    authmethod=hlid(details.authmethod),
-                    authextra=hlid(details.authextra),
-                    realm=hlid(self._realm))
+                if _is_debug_enabled():
+                    self.log.debug(
+                        '{meth}: cookiestore.setAuth[2](cbtid={cbtid}, authid={authid}, authrole={authrole}, authmethod={authmethod}, authextra={authextra}, realm={realm})',
+                        meth=hltype(self.onJoin),
+                        cbtid=hlid(self._transport._cbtid),
+                        authid=hlid(details.authid),
+                        authrole=hlid(details.authrole),
+                        authmethod=hlid(details.authmethod),
+                        authextra=hlid(details.authextra),
+                        realm=hlid(self._realm))
 
         # router-realm service session to use for WAMP meta API
         assert self._router
@@ -1079,6 +1278,14 @@ class RouterSession(BaseSession):
         # remember session details we've got
         self._session_details = details
 
+        # short session information published with WAMP session statistics events
+        self._session_info_short = {
+            'session': details.session,
+            'realm': self._realm,
+            'authid': details.authid,
+            'authrole': details.authrole,
+        }
+
         # main handling of new session
         self._router._session_joined(self, details)
 
@@ -1087,36 +1294,26 @@ class RouterSession(BaseSession):
             self._service_session.publish('wamp.session.on_join', details.marshal())
 
             # possibly dispatch WAMP PubSub statistics events
-            realm_config = self._router_factory._routers[self._realm]._realm.config
-            if 'stats' in realm_config:
-                rated_message_size = realm_config['stats'].get('rated_message_size', 512)
-                trigger_after_rated_messages = realm_config['stats'].get('trigger_after_rated_messages', 0)
-                trigger_after_duration = realm_config['stats'].get('trigger_after_duration', 0)
-                trigger_on_join = realm_config['stats'].get('trigger_on_join', False)
-                trigger_on_leave = realm_config['stats'].get('trigger_on_leave', True)
-
-                assert isinstance(rated_message_size, int) and rated_message_size > 0 and rated_message_size % 2 == 0
-                assert isinstance(trigger_after_rated_messages, int)
-                assert isinstance(trigger_after_duration, int)
-                assert trigger_after_rated_messages or trigger_after_duration
-                assert isinstance(trigger_on_join, bool)
-                assert isinstance(trigger_on_leave, bool)
+            service_session = self._service_session
+            serializer = self._transport._serializer
+            stats_config = self._router._realm.stats
+            if stats_config is not None:
+                rated_message_size = stats_config.rated_message_size
+                trigger_after_rated_messages = stats_config.trigger_after_rated_messages
+                trigger_after_duration = stats_config.trigger_after_duration
+                trigger_on_join = stats_config.trigger_on_join
+                trigger_on_leave = stats_config.trigger_on_leave
 
                 # setup serializer stats event publishing
-                session_info_short = {
-                    'realm': self._realm,
-                    'session': details.session,
-                    'authid': details.authid,
-                    'authrole': details.authrole,
-                }
+                session_info_short = self._session_info_short
                 self._stats_trigger_on_leave = trigger_on_leave
 
                 # if enabled, publish first stats event immediately when session is joined.
                 if trigger_on_join:
-                    session_stats = self._transport._serializer.stats()
+                    session_stats = serializer.stats()
                     session_stats['first'] = True
                     session_stats['last'] = False
-                    self._service_session.publish('wamp.session.on_stats', session_info_short, session_stats)
+                    service_session.publish('wamp.session.on_stats', dict(session_info_short), session_stats)
                     self._stats_has_triggered_first = True
                 else:
                     self._stats_has_triggered_first = False
@@ -1129,11 +1326,10 @@ class RouterSession(BaseSession):
                         stats['first'] = True
                         self._stats_has_triggered_first = True
                     stats['last'] = False
-                    self._service_session.publish('wamp.session.on_stats', session_info_short, stats)
+                    service_session.publish('wamp.session.on_stats', dict(session_info_short), stats)
 
-                self._transport._serializer.RATED_MESSAGE_SIZE = rated_message_size
-                self._transport._serializer.set_stats_autoreset(trigger_after_rated_messages, trigger_after_duration,
-                                                                on_stats)
+                serializer.RATED_MESSAGE_SIZE = rated_message_size
+                serializer.set_stats_autoreset(trigger_after_rated_messages, trigger_after_duration, on_stats)
 
                 self._stats_enabled = True
 
@@ -1148,7 +1344,8 @@ class RouterSession(BaseSession):
 
             else:
                 self._stats_enabled = False
-                self.log.debug('WAMP session statistics {mode}', mode=hl('DISABLED'))
+                if _is_debug_enabled():
+                    self.log.debug('WAMP session statistics {mode}', mode=hl('DISABLED'))
 
     def onWelcome(self, msg):
         # this is a hook for authentication methods to deny the
@@ -1159,39 +1356,37 @@ class RouterSession(BaseSession):
     def onLeave(self, details: CloseDetails):
 
         session_id = self._session_id or self._previous_session_id
+        router = self._router
+        service_session = self._service_session
+        transport = self._transport
 
         # _router can be None when, e.g., authentication fails hard
         # (e.g. the client aborts the connection during auth challenge
         # because they hit a syntax error)
-        if self._router is not None:
-            # todo: move me into detatch when session resumption happens
-            for msg in self._testaments["detached"]:
-                self._router.process(self, msg)
+        if router is not None:
+            testaments = self._testaments
+            if testaments:
+                # todo: move me into detatch when session resumption happens
+                process = router.process
+                for msg in chain(testaments.get("detached", ()), testaments.get("destroyed", ())):
+                    process(self, msg)
 
-            for msg in self._testaments["destroyed"]:
-                self._router.process(self, msg)
-
-            self._router._session_left(self, self._session_details, details)
+            router._session_left(self, self._session_details, details)
 
         # dispatch session metaevent from WAMP AP
         #
-        if self._service_session and self._session_id:
+        if service_session and self._session_id:
             # if we got a proper Goodbye, we already sent out the
             # on_leave and our self._session_id is already None; if
             # the transport vanished our _session_id will still be
             # valid.
-            self._service_session.publish('wamp.session.on_leave', self._session_id)
+            service_session.publish('wamp.session.on_leave', self._session_id)
 
             if self._stats_enabled and self._stats_trigger_on_leave:
-                if self._transport:
+                if transport:
                     # publish final serializer stats for WAMP client connection being closed
-                    session_info_short = {
-                        'session': self._session_id,
-                        'realm': self._realm,
-                        'authid': self._authid,
-                        'authrole': self._authrole,
-                    }
-                    session_stats = self._transport._serializer.stats()
+                    session_info_short = self._get_session_info_short()
+                    session_stats = transport._serializer.stats()
 
                     # the stats might both be the first _and_ the last we'll publish for this session
                     if self._stats_has_triggered_first:
@@ -1200,7 +1395,7 @@ class RouterSession(BaseSession):
                         session_stats['first'] = True
                         self._stats_has_triggered_first = True
                     session_stats['last'] = True
-                    self._service_session.publish('wamp.session.on_stats', session_info_short, session_stats)
+                    service_session.publish('wamp.session.on_stats', session_info_short, session_stats)
                 else:
                     self.log.warn(
                         '{klass}.onLeave() - could not retrieve last statistics for closing session {session_id}',
@@ -1216,22 +1411,25 @@ class RouterSession(BaseSession):
             cnt_kicked = 0
 
             # if cookie was set on transport
-            if self._transport and hasattr(
-                    self._transport, '_cbtid') and self._transport._cbtid and self._transport.factory._cookiestore:
-                cbtid = self._transport._cbtid
-                cs = self._transport.factory._cookiestore
+            if transport and transport._cbtid and transport.factory._cookiestore:
+                cbtid = transport._cbtid
+                cs = transport.factory._cookiestore
+
+                # all transport protos (eg WampWebSocketServerProtocol) for the same auth cookie, but
+                # not ourselves - get these before deleting the cookie, as only then they are returned
+                protos = [proto for proto in cs.getProtos(cbtid) if proto != transport]
 
                 # set cookie to "not authenticated"
                 # cs.setAuth(cbtid, None, None, None, None, None)
                 cs.delAuth(cbtid)
                 cookie_deleted = cbtid
 
-                # kick all transport protos (eg WampWebSocketServerProtocol) for the same auth cookie
-                for proto in cs.getProtos(cbtid):
-                    # but don't kick ourselves
-                    if proto != self._transport:
-                        proto.sendClose()
-                        cnt_kicked += 1
+                # kick all those transport protos, each in its own trip through the reactor loop
+                # so that many connections sharing the cookie do not block the reactor
+                reactor = self._router_factory._reactor
+                for proto in protos:
+                    reactor.callLater(0, proto.sendClose)
+                cnt_kicked = len(protos)
 
             self.log.info(
                 '{func} {action} completed for session {session_id} (cookie authentication deleted: '
@@ -1267,7 +1465,11 @@ class RouterSessionFactory(object):
         assert isinstance(routerFactory, RouterFactory)
 
         self._routerFactory = routerFactory
-        self._app_sessions = {}
+
+        # map: application session -> router application session, for sessions running embedded
+        # in a router - like all router state, this is only ever accessed from the reactor thread,
+        # and hence a plain dict without any locking
+        self._app_sessions: Dict[ISession, RouterApplicationSession] = {}
 
     def add(self,
             session: ISession,
@@ -1287,7 +1489,8 @@ class RouterSessionFactory(object):
         assert authrole is None or isinstance(authrole, str)
         assert authextra is None or isinstance(authextra, dict)
 
-        if session not in self._app_sessions:
+        router_session = self._app_sessions.get(session, None)
+        if router_session is None:
             router_session = RouterApplicationSession(session,
                                                       router,
                                                       authid,
@@ -1303,7 +1506,6 @@ class RouterSessionFactory(object):
                 klass=self.__class__.__name__,
                 session=session,
                 router=router)
-            router_session = self._app_sessions[session]
         return router_session
 
     def remove(self, session):
@@ -1313,12 +1515,9 @@ class RouterSessionFactory(object):
         :param: session: A WAMP application session currently embedded in a router created from this factory.
         :type session: instance of :class:`autobahn.wamp.protocol.ApplicationSession`
         """
-        assert isinstance(session, ApplicationSession)
-
-        if session in self._app_sessions:
-            self._app_sessions[session]._session.disconnect()
-
-            del self._app_sessions[session]
+        if self._app_sessions.pop(session, None) is not None:
+            # the router application session wraps this very session
+            session.disconnect()
 
         else:
             self.log.warn(
@@ -5,6 +5,8 @@
 #
 #####################################################################################
 
+import os
+
 from twisted.trial import unittest
 
 import txaio
@@ -77,6 +79,26 @@ class TestBrokerPublish(unittest.TestCase):
     def tearDown(self):
         pass
 
+    def _setup_hello(self):
+        """
+        Set up the worker (the realm container used by pending authentications) for
+        processing HELLOs, and create a mock transport which did not authenticate the client.
+        """
+        worker = mock.Mock()
+        worker.has_realm.return_value = True
+        worker.has_role.return_value = True
+        worker.personality.EXTRA_AUTH_METHODS = {}
+        self.router_factory._worker = worker
+
+        transport = mock.MagicMock()
+        transport.transport_details = TransportDetails(channel_id={'tls-unique': b'deadbeef'})
+        transport.factory._config = {}
+        transport._authid = None
+        transport._authrealm = None
+        transport._cbtid = None
+        transport.peer = 'tcp4:127.0.0.1:65000'
+        return transport
+
     def test_add(self):
         """
         Create an application session and add it to a router to
@@ -165,6 +187,208 @@ class TestBrokerPublish(unittest.TestCase):
             self.assertTrue('err' in call[2])
             self.assertEqual(call[2]['err'].value, the_exception)
 
+    def test_router_session_hello_welcome(self):
+        """
+        An anonymous HELLO on an unauthenticated transport is answered with WELCOME
+        """
+        transport = self._setup_hello()
+
+        session = self.session_factory()  # __call__ on the _RouterSessionFactory
+        session.onOpen(transport)
+        session.onMessage(message.Hello('realm1', dict(caller=role.RoleCallerFeatures())))
+
+        sent = [call[1][0] for call in transport.method_calls if call[0] == 'send']
+        self.assertEqual(1, len(sent))
+        welcome = sent[0]
+        self.assertIsInstance(welcome, message.Welcome)
+        self.assertEqual(welcome.session, session._session_id)
+        self.assertEqual(welcome.authrole, 'anonymous')
+        self.assertEqual(welcome.authmethod, 'anonymous')
+        self.assertEqual(welcome.authextra['x_cb_peer'], 'tcp4:127.0.0.1:65000')
+        self.assertEqual(welcome.authextra['x_cb_node'], 'node1')
+        self.assertEqual(welcome.authextra['x_cb_worker'], 'router1')
+        self.assertEqual(welcome.authextra['x_cb_pid'], os.getpid())
+        self.assertTrue(self.router.is_attached(session))
+
+    def test_router_session_hello_personality_authmethod(self):
+        """
+        Authmethods added by the router personality are available for HELLOs, where the
+        built-in authmethods take precedence
+        """
+        from crossbar.router.auth import AUTHMETHOD_MAP
+        from crossbar.router.auth.pending import PendingAuth
+        from crossbar.router.session import _get_authmethods
+
+        class PendingAuthStub(PendingAuth):
+            AUTHMETHOD = 'x-stub'
+
+            def hello(self, realm, details):
+                return types.Accept(realm=realm, authid='stub-user', authrole='anonymous', authmethod='x-stub')
+
+        class StubPersonality(object):
+            EXTRA_AUTH_METHODS = {'x-stub': PendingAuthStub, 'ticket': PendingAuthStub}
+
+        known_authmethods, pending_authmethods, authmethod_klasses = _get_authmethods(
+            StubPersonality.EXTRA_AUTH_METHODS)
+        self.assertIn('x-stub', known_authmethods)
+        self.assertIn('x-stub', pending_authmethods)
+        self.assertIs(authmethod_klasses['x-stub'], PendingAuthStub)
+        self.assertIs(authmethod_klasses['ticket'], AUTHMETHOD_MAP['ticket'])
+        self.assertIs(authmethod_klasses['anonymous'], AUTHMETHOD_MAP['anonymous'])
+
+        # the authmethods are computed once per personality authmethods map ..
+        self.assertIs(_get_authmethods(StubPersonality.EXTRA_AUTH_METHODS)[2], authmethod_klasses)
+
+        # .. and again for a different one
+        known_authmethods, _, authmethod_klasses = _get_authmethods({'x-other': PendingAuthStub})
+        self.assertIn('x-other', known_authmethods)
+        self.assertNotIn('x-stub', known_authmethods)
+        self.assertNotIn('x-stub', authmethod_klasses)
+
+        transport = self._setup_hello()
+        transport.factory._config = {'auth': {'x-stub': {'type': 'static'}}}
+        self.router_factory._worker.personality = StubPersonality
+
+        session = self.session_factory()  # __call__ on the _RouterSessionFactory
+        session.onOpen(transport)
+        session.onMessage(message.Hello('realm1', dict(caller=role.RoleCallerFeatures()), authmethods=['x-stub']))
+
+        sent = [call[1][0] for call in transport.method_calls if call[0] == 'send']
+        self.assertEqual(1, len(sent))
+        self.assertIsInstance(sent[0], message.Welcome)
+        self.assertEqual(sent[0].authid, 'stub-user')
+        self.assertEqual(sent[0].authmethod, 'x-stub')
+
+    def test_router_session_hello_result_subclass(self):
+        """
+        Results of an overridden onHello which are subclasses of Accept or Deny are
+        answered with WELCOME or ABORT
+        """
+        class CustomAccept(types.Accept):
+            pass
+
+        class CustomDeny(types.Deny):
+            pass
+
+        for result, expected in [(CustomAccept(realm='realm1', authid='user1', authrole='anonymous'), message.Welcome),
+                                 (CustomDeny(), message.Abort)]:
+
+            class TestSession(RouterSession):
+                def onHello(self, realm, details):
+                    return result
+
+            transport = self._setup_hello()
+            session = TestSession(self.router_factory)
+            session.onOpen(transport)
+            session.onMessage(message.Hello('realm1', dict(caller=role.RoleCallerFeatures())))
+
+            sent = [call[1][0] for call in transport.method_calls if call[0] == 'send']
+            self.assertEqual(1, len(sent))
+            self.assertIsInstance(sent[0], expected)
+
+    def _assert_hello_join_error_aborts(self, session):
+        """
+        Check a HELLO to the given session, which fails to join, aborts the session.
+        """
+        transport = self._setup_hello()
+        session.onOpen(transport)
+        session.onMessage(message.Hello('realm1', dict(caller=role.RoleCallerFeatures())))
+
+        sent = [call[1][0] for call in transport.method_calls if call[0] == 'send']
+        self.assertIsInstance(sent[-1], message.Abort)
+        self.assertEqual(sent[-1].reason, 'wamp.error.authorization_failed')
+        self.assertFalse(self.router.is_attached(session))
+
+        # the error was logged (flushing it also keeps trial from failing the test)
+        self.assertEqual(1, len(self.flushLoggedErrors(RuntimeError)))
+
+    def test_router_session_hello_join_error(self):
+        """
+        Errors joining a router session after the default onHello accepted a HELLO abort the session
+        """
+        class TestSession(RouterSession):
+            def onJoin(self, details):
+                raise RuntimeError("onJoin failed")
+
+        self._assert_hello_join_error_aborts(TestSession(self.router_factory))
+
+    def test_router_session_hello_join_error_on_hello(self):
+        """
+        Errors joining a router session after an overridden onHello accepted a HELLO abort the session
+        """
+        class TestSession(RouterSession):
+            def onHello(self, realm, details):
+                return super(TestSession, self).onHello(realm, details)
+
+            def onJoin(self, details):
+                raise RuntimeError("onJoin failed")
+
+        self._assert_hello_join_error_aborts(TestSession(self.router_factory))
+
+    def test_router_session_hello_welcome_transports(self):
+        """
+        An anonymous HELLO is answered with WELCOME over every transport class
+        carrying router sessions, without any authentication done by the transport
+        """
+        from crossbar.router.protocol import WampWebSocketServerProtocol, WampRawSocketServerProtocol
+        from crossbar.router.longpoll import WampLongPollResourceSession
+        from crossbar.node.native import NativeWorkerClientProtocol
+        from crossbar.bridge.mqtt.wamp import WampTransport
+
+        self._setup_hello()
+
+        transports = [
+            WampWebSocketServerProtocol(),
+            WampRawSocketServerProtocol(),
+            WampLongPollResourceSession(mock.Mock(_killAfter=0), {
+                'transport': 'transport1',
+                'serializer': mock.Mock()
+            }),
+            NativeWorkerClientProtocol(),
+            WampTransport(mock.Mock(), mock.Mock(), mock.Mock()),
+        ]
+        for transport in transports:
+            # connection state set up by the (listening) transport factories
+            transport.factory = mock.Mock(_config={})
+            transport_details = TransportDetails(channel_id={'tls-unique': b'deadbeef'})
+            if isinstance(getattr(type(transport), 'transport_details', None), property):
+                # autobahn transports expose the transport details of the connection read-only
+                transport._transport_details = transport_details
+            else:
+                transport.transport_details = transport_details
+            transport.peer = 'tcp4:127.0.0.1:65000'
+            transport.send = mock.Mock()
+
+            session = self.session_factory()  # __call__ on the _RouterSessionFactory
+            session.onOpen(transport)
+            session.onMessage(message.Hello('realm1', dict(caller=role.RoleCallerFeatures())))
+
+            self.assertEqual(1, transport.send.call_count, transport.__class__.__name__)
+            welcome = transport.send.call_args[0][0]
+            self.assertIsInstance(welcome, message.Welcome, transport.__class__.__name__)
+            self.assertEqual(welcome.authrole, 'anonymous')
+            self.assertTrue(self.router.is_attached(session))
+
+    def test_router_session_on_join(self):
+        """
+        Joining a router session publishes its marshaled session details with wamp.session.on_join
+        """
+        transport = self._setup_hello()
+
+        # the realm service session publishing the WAMP meta API events
+        self.realm.session = mock.Mock()
+
+        session = self.session_factory()  # __call__ on the _RouterSessionFactory
+        session.onOpen(transport)
+        session.onMessage(message.Hello('realm1', dict(caller=role.RoleCallerFeatures())))
+
+        self.realm.session.publish.assert_called_once()
+        topic, on_join_details = self.realm.session.publish.call_args[0]
+        self.assertEqual(topic, 'wamp.session.on_join')
+        self.assertEqual(on_join_details['session'], session._session_id)
+
+        self.assertEqual(on_join_details, session.session_details.marshal())
+
     def test_router_session_internal_error_onAuthenticate(self):
         """
         similar to above, but during _RouterSession's onMessage handling,
@@ -785,3 +1009,92 @@ class TestRouterSession(unittest.TestCase):
         self.assertFalse(session.on_leave_called)
         session.onMessage(goodbye)
         self.assertTrue(session.on_leave_called)
+
+    def test_logout_kicks_cookie_sessions(self):
+        """
+        Leaving with wamp.close.logout deletes the authentication cookie and closes all other
+        transports sharing that cookie (from the reactor loop).
+        """
+        from crossbar.router.cookiestore import CookieStoreMemoryBacked
+
+        cookiestore = CookieStoreMemoryBacked({})
+        cbtid, _ = cookiestore.create()
+
+        transport = mock.MagicMock()
+        transport._cbtid = cbtid
+        transport.factory._cookiestore = cookiestore
+        other_transport = mock.MagicMock()
+        cookiestore.addProto(cbtid, transport)
+        cookiestore.addProto(cbtid, other_transport)
+
+        router_factory = mock.MagicMock()
+        router_factory._reactor = Clock()
+        session = RouterSession(router_factory)
+        session._transport = transport
+        session._session_id = None
+        session._previous_session_id = 1234
+
+        session.onLeave(types.CloseDetails(reason='wamp.close.logout'))
+
+        self.assertFalse(cookiestore.exists(cbtid))
+        self.assertFalse(other_transport.sendClose.called)
+        router_factory._reactor.advance(0)
+        self.assertTrue(other_transport.sendClose.called)
+        self.assertFalse(transport.sendClose.called)
+
+    def test_extract_cookie(self):
+        """
+        Cookies are extracted from cookie headers like the full cookie parser does.
+        """
+        from crossbar.router.session import _extract_cookie
+
+        self.assertEqual(_extract_cookie('cbtid=abc', 'cbtid'), 'abc')
+        self.assertEqual(_extract_cookie('foo=1; cbtid=abc; bar=2', 'cbtid'), 'abc')
+        self.assertEqual(_extract_cookie('foo=1;cbtid=abc', 'cbtid'), 'abc')
+        self.assertEqual(_extract_cookie('cbtid=abc; cbtid=def', 'cbtid'), 'abc')
+        self.assertEqual(_extract_cookie('cbtid =abc', 'cbtid'), 'abc')
+        self.assertEqual(_extract_cookie('cbtid=abc def; cbtid=def', 'cbtid'), 'def')
+        self.assertEqual(_extract_cookie('foo=1; cbtid="a\\"bc"', 'cbtid'), 'a"bc')
+        self.assertEqual(_extract_cookie('a="x; cbtid=evil"; cbtid=good', 'cbtid'), 'good')
+
+    def test_extract_cookie_missing(self):
+        """
+        Missing or invalid cookies are not extracted from cookie headers.
+        """
+        from crossbar.router.session import _extract_cookie
+
+        self.assertIsNone(_extract_cookie('', 'cbtid'))
+        self.assertIsNone(_extract_cookie('foo=1; bar=2', 'cbtid'))
+        self.assertIsNone(_extract_cookie('xcbtid=abc; foo=cbtid=def', 'cbtid'))
+        self.assertIsNone(_extract_cookie('a=1; cbtid=abc def', 'cbtid'))
+
+    def test_is_debug_enabled(self):
+        """
+        Debug log gating follows the global log level.
+        """
+        from crossbar.router.session import _is_debug_enabled
+
+        old_level = txaio.get_global_log_level()
+        self.addCleanup(txaio.set_global_log_level, old_level)
+
+        txaio.set_global_log_level('info')
+        self.assertFalse(_is_debug_enabled())
+
+        txaio.set_global_log_level('debug')
+        self.assertTrue(_is_debug_enabled())
+
+        txaio.set_global_log_level('trace')
+        self.assertTrue(_is_debug_enabled())
+
+    def test_session_info_short(self):
+        """
+        Every WAMP session statistics event gets its own copy of the short session information.
+        """
+        session = RouterSession(mock.MagicMock())
+        session._session_id = 1234
+        session._session_info_short = {'session': 1234, 'realm': 'realm1', 'authid': 'user1', 'authrole': 'role1'}
+
+        session_info_short = session._get_session_info_short()
+        self.assertEqual(session_info_short, session._session_info_short)
+        self.assertIsNot(session_info_short, session._session_info_short)
+        self.assertIsNot(session_info_short, session._get_session_info_short())
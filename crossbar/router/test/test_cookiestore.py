@@ -1,7 +1,8 @@
-from crossbar.router.cookiestore import CookieStoreFileBacked
+from crossbar.router.cookiestore import CookieStoreFileBacked, CookieStoreDatabaseBacked
 import json
 import tempfile
 import unittest
+from unittest import mock
 import time
 from datetime import datetime
 from autobahn import util
@@ -185,3 +186,38 @@ class TestCookieStore(unittest.TestCase):
 
             actual = self.read_cookies_from_file(fp)
             self.assertEqual(actual, expected)
+
+    def test_database_set_auth(self):
+
+        with tempfile.TemporaryDirectory() as dbpath:
+            cookiestore = CookieStoreDatabaseBacked(dbpath, {'store': {'type': 'database', 'path': dbpath}})
+            cbtid, _ = cookiestore.create()
+
+            # record the transactions opened on the database
+            cookiestore._db = mock.Mock(wraps=cookiestore._db)
+            begin = cookiestore._db.begin
+
+            # changed auth info is written to the database
+            self.assertTrue(
+                cookiestore.setAuth(cbtid, 'example.authid', 'example.authrole', 'example.authmethod', {'a': 'b'},
+                                    'example.authrealm'))
+            self.assertIn(mock.call(write=True), begin.call_args_list)
+            self.assertEqual(cookiestore.getAuth(cbtid),
+                             ('example.authid', 'example.authrole', 'example.authmethod', 'example.authrealm', {
+                                 'a': 'b'
+                             }))
+
+            # unchanged auth info does not open a write transaction
+            begin.reset_mock()
+            self.assertFalse(
+                cookiestore.setAuth(cbtid, 'example.authid', 'example.authrole', 'example.authmethod', {'a': 'b'},
+                                    'example.authrealm'))
+            self.assertTrue(begin.called)
+            self.assertNotIn(mock.call(write=True), begin.call_args_list)
+
+            # unknown cookies are not written
+            begin.reset_mock()
+            self.assertFalse(
+                cookiestore.setAuth('doesNotExist', 'example.authid', 'example.authrole', 'example.authmethod', {},
+                                    'example.authrealm'))
+            self.assertNotIn(mock.call(write=True), begin.call_args_list)
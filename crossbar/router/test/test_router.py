@@ -5,6 +5,7 @@
 #
 #####################################################################################
 
+from twisted.internet.task import Clock
 from twisted.trial import unittest
 
 import txaio
@@ -163,6 +164,62 @@ class TestEmbeddedSessions(unittest.TestCase):
 
         return d
 
+    def test_remove(self):
+        """
+        Removing an application session running embedded detaches it from
+        the router right away when no message delivery is in progress.
+        """
+        session = ApplicationSession(types.ComponentConfig('realm1'))
+
+        self.session_factory.add(session, self.router)
+        self.assertTrue(self.router.is_attached(session))
+
+        self.session_factory.remove(session)
+        self.assertFalse(self.router.is_attached(session))
+
+    def test_remove_during_event_delivery(self):
+        """
+        Removing an application session running embedded while the router is
+        delivering an event to it defers detaching to the reactor loop (#578).
+        """
+        self.router_factory._reactor = Clock()
+        session_factory = self.session_factory
+
+        class TestSession(ApplicationSession):
+            def onJoin(self, details):
+                # noinspection PyUnusedLocal
+                def on_event(*arg, **kwargs):
+                    session_factory.remove(self)
+
+                return self.subscribe(on_event, 'com.example.topic1')
+
+        session = TestSession(types.ComponentConfig('realm1'))
+        self.session_factory.add(session, self.router)
+
+        publisher = ApplicationSession(types.ComponentConfig('realm1'))
+        self.session_factory.add(publisher, self.router)
+        publisher.publish('com.example.topic1')
+
+        # the event was delivered, but the session is not detached while the
+        # broker iterates over the subscribers
+        self.assertTrue(self.router.is_attached(session))
+
+        self.router_factory._reactor.advance(0)
+        self.assertFalse(self.router.is_attached(session))
+
+    def test_is_closed(self):
+        """
+        Every consumer of the is_closed future of the transport of an application
+        session running embedded gets the transport as result.
+        """
+        session = ApplicationSession(types.ComponentConfig('realm1'))
+        transport = self.session_factory.add(session, self.router)
+
+        results = []
+        transport.is_closed.addCallback(results.append)
+        transport.is_closed.addCallback(results.append)
+        self.assertEqual(results, [transport, transport])
+
     def test_application_session_internal_error(self):
         """
         simulate an internal error triggering the 'onJoin' error-case from
@@ -0,0 +1,104 @@
+#####################################################################################
+#
+#  Copyright (c) typedef int GmbH
+#  SPDX-License-Identifier: EUPL-1.2
+#
+#####################################################################################
+
+from twisted.trial import unittest
+
+from crossbar.worker.types import RouterRealm, RouterRealmStats
+
+
+class TestRouterRealmStats(unittest.TestCase):
+    """
+    Tests for crossbar.worker.types.RouterRealmStats
+    """
+    def test_parse_defaults(self):
+        """
+        Items missing in the statistics configuration are set to their defaults.
+        """
+        stats = RouterRealmStats.parse({'trigger_after_duration': 1000})
+        self.assertEqual(
+            stats,
+            RouterRealmStats(rated_message_size=512,
+                             trigger_after_rated_messages=0,
+                             trigger_after_duration=1000,
+                             trigger_on_join=False,
+                             trigger_on_leave=True))
+
+    def test_parse(self):
+        stats = RouterRealmStats.parse({
+            'rated_message_size': 1024,
+            'trigger_after_rated_messages': 100,
+            'trigger_after_duration': 0,
+            'trigger_on_join': True,
+            'trigger_on_leave': False,
+        })
+        self.assertEqual(stats, RouterRealmStats(1024, 100, 0, True, False))
+
+    def test_parse_invalid(self):
+        """
+        Invalid statistics configurations are rejected.
+        """
+        for config in [
+            {
+                'rated_message_size': 0,
+                'trigger_after_duration': 1000
+            },
+            {
+                'rated_message_size': 511,
+                'trigger_after_duration': 1000
+            },
+            {
+                'rated_message_size': '512',
+                'trigger_after_duration': 1000
+            },
+            {
+                'trigger_after_rated_messages': '100'
+            },
+            {
+                'trigger_after_duration': 1.5
+            },
+            {},
+            {
+                'trigger_after_duration': 1000,
+                'trigger_on_join': 1
+            },
+            {
+                'trigger_after_duration': 1000,
+                'trigger_on_leave': None
+            },
+        ]:
+            self.assertRaises(AssertionError, RouterRealmStats.parse, config)
+
+
+class TestRouterRealm(unittest.TestCase):
+    """
+    Tests for crossbar.worker.types.RouterRealm
+    """
+    def test_stats_disabled(self):
+        realm = RouterRealm(None, None, {'name': 'realm1'})
+        self.assertIsNone(realm.stats)
+
+    def test_stats_cached(self):
+        """
+        The statistics configuration is parsed from the realm configuration only once.
+        """
+        realm = RouterRealm(None, None, {'name': 'realm1', 'stats': {'trigger_after_duration': 1000}})
+        stats = realm.stats
+        self.assertEqual(stats.trigger_after_duration, 1000)
+        self.assertIs(realm.stats, stats)
+
+    def test_stats_config_replaced(self):
+        """
+        The statistics configuration is parsed again when the realm configuration is replaced.
+        """
+        realm = RouterRealm(None, None, {'name': 'realm1', 'stats': {'trigger_after_duration': 1000}})
+        self.assertEqual(realm.stats.trigger_after_duration, 1000)
+
+        realm.config = {'name': 'realm1', 'stats': {'trigger_after_duration': 2000}}
+        self.assertEqual(realm.stats.trigger_after_duration, 2000)
+
+        realm.config = {'name': 'realm1'}
+        self.assertIsNone(realm.stats)
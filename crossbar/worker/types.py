@@ -6,6 +6,7 @@
 #####################################################################################
 
 from datetime import datetime
+from typing import NamedTuple, Optional
 
 from autobahn.util import utcstr
 
@@ -46,6 +47,41 @@ class RouterComponent(object):
         }
 
 
+class RouterRealmStats(NamedTuple):
+    """
+    WAMP session statistics configuration of a realm (item ``stats`` in the realm configuration).
+    """
+    rated_message_size: int
+    trigger_after_rated_messages: int
+    trigger_after_duration: int
+    trigger_on_join: bool
+    trigger_on_leave: bool
+
+    @staticmethod
+    def parse(config: dict) -> 'RouterRealmStats':
+        """
+        Parse and check WAMP session statistics configuration.
+
+        :param config: The ``stats`` item of a realm configuration.
+        :return: The parsed statistics configuration.
+        """
+        rated_message_size = config.get('rated_message_size', 512)
+        trigger_after_rated_messages = config.get('trigger_after_rated_messages', 0)
+        trigger_after_duration = config.get('trigger_after_duration', 0)
+        trigger_on_join = config.get('trigger_on_join', False)
+        trigger_on_leave = config.get('trigger_on_leave', True)
+
+        assert isinstance(rated_message_size, int) and rated_message_size > 0 and rated_message_size % 2 == 0
+        assert isinstance(trigger_after_rated_messages, int)
+        assert isinstance(trigger_after_duration, int)
+        assert trigger_after_rated_messages or trigger_after_duration
+        assert isinstance(trigger_on_join, bool)
+        assert isinstance(trigger_on_leave, bool)
+
+        return RouterRealmStats(rated_message_size, trigger_after_rated_messages, trigger_after_duration,
+                                trigger_on_join, trigger_on_leave)
+
+
 class RouterRealm(object):
     """
     A realm running in a router worker.
@@ -104,6 +140,21 @@ class RouterRealm(object):
         # role WAMP name -> Crossbar.io role run-time ID
         self.role_to_id = {}
 
+        # realm configuration and WAMP session statistics configuration parsed from it (see stats)
+        self._stats_parsed_config = None
+        self._stats: Optional[RouterRealmStats] = None
+
+    @property
+    def stats(self) -> Optional[RouterRealmStats]:
+        """
+        The WAMP session statistics configuration of this realm, or ``None`` if statistics
+        are not enabled. This is parsed from the realm configuration only once.
+        """
+        if self.config is not self._stats_parsed_config:
+            self._stats = RouterRealmStats.parse(self.config['stats']) if 'stats' in self.config else None
+            self._stats_parsed_config = self.config
+        return self._stats
+
     def marshal(self):
         marshalled = {
             'id': self.id,